@@ -1,6 +1,9 @@
 # coding=utf-8
 
-from vfxnaming.naming import parse, solve, get_repo, save_session, load_session  # noqa: F401
+from vfxnaming.naming import (  # noqa: F401
+    parse, solve, solve_many, solve_cached, clear_solve_cache,
+    get_repo, save_session, load_session
+)
 from vfxnaming.rules import (  # noqa: F401
     add_rule, remove_rule, has_rule, reset_rules, get_active_rule, set_active_rule,
     get_rule, get_rules, save_rule, load_rule, Rule
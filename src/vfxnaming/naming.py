@@ -16,17 +16,19 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-from __future__ import absolute_import, print_function
-
 import os
 import json
+import logging
+import weakref
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 import vfxnaming.rules as rules
 import vfxnaming.tokens as tokens
+import vfxnaming.serialize as serialize
 from vfxnaming.logger import logger
 from vfxnaming.error import SolvingError
 
-import six
-
 NAMING_REPO_ENV = "NAMING_REPO"
 
 
@@ -77,55 +79,132 @@ def solve(*args, **kwargs):
     Returns:
         str: A string with the resulting name.
     """
+    return _solve_rule(rules.get_active_rule(), args, kwargs)
+
+
+def solve_cached(*args, **kwargs):
+    """Same as solve(), but resulting names are cached for the currently active
+    rule and given arguments. Useful when the same names are solved over and over,
+    like shot lists referencing the same shots many times.
+
+    Adding, removing or resetting Tokens through the tokens module functions
+    invalidates cached names. Changes made directly to a Token's options don't,
+    so call clear_solve_cache() after them.
+
+    Raises:
+        SolvingError: No active rule is set for the session.
+        SolvingError: A required token was passed as None to keyword arguments.
+        SolvingError: Missing argument for one field in currently active rule.
+
+    Returns:
+        str: A string with the resulting name.
+    """
+    rule = rules.get_active_rule()
+    if rule is None:
+        raise SolvingError("No active rule found to solve from.")
+    # * Types are part of the key, as 1, 1.0 and True are equal but don't solve the same
+    args_key = tuple([(type(each), each) for each in args])
+    kwargs_key = tuple(sorted([(k, type(v), v) for k, v in kwargs.items()]))
+    try:
+        hash((args_key, kwargs_key))
+    except TypeError:
+        # Unhashable arguments can't be cached, solve them directly
+        return _solve_rule(rule, args, kwargs)
+    return _solve_cached(weakref.ref(rule), tokens._generation, args_key, kwargs_key)
+
+
+def clear_solve_cache():
+    """Clear all names cached by solve_cached().
+
+    Returns:
+        bool: True if clearing was successful.
+    """
+    _solve_cached.cache_clear()
+    return True
+
+
+def solve_many(rows):
+    """Build one name per given row following currently active rule. Tokens
+    are looked up once for the whole batch instead of once per name.
+
+    Each row is a dictionary with the same keyword arguments solve() accepts,
+    including digits for repeated tokens.
+
+    i.e.: [{'whatAffects': 'chars', 'digits': 1}, {'whatAffects': 'env', 'digits': 2}]
+
+    Args:
+        rows (list): Dictionaries of keyword arguments, one per name to solve.
+
+    Raises:
+        SolvingError: A required token is missing in one of the rows.
+
+    Returns:
+        list: Strings with the resulting names, in the same order as rows.
+    """
     rule = rules.get_active_rule()
-    # * This accounts for those cases where a token is used more than once in a rule
-    repeated_fields = dict()
-    for each in rule.fields:
-        if each not in repeated_fields.keys():
-            if rule.fields.count(each) > 1:
-                repeated_fields[each] = 1
-    fields_with_digits = list()
-    for each in rule.fields:
-        if each in repeated_fields.keys():
-            counter = repeated_fields.get(each)
-            repeated_fields[each] = counter + 1
-            fields_with_digits.append("{}{}".format(each, counter))
-        else:
-            fields_with_digits.append(each)
-    values = dict()
+    field_tokens = _field_tokens(rule)
+    logger.debug("Solving rule '{}' for {} rows".format(rule.name, len(rows)))
+    return [rule.compose(_solve_values(field_tokens, (), row)) for row in rows]
+
+
+@functools.lru_cache(maxsize=100000)
+def _solve_cached(rule_ref, tokens_generation, args_key, kwargs_key):
+    # Rules hash by identity, so replacing or switching rules never hits old entries.
+    # Keeping a weak reference lets removed rules be freed while their entries age out.
+    # Same for tokens_generation, which changes whenever the tokens registry does.
+    args = tuple([each for _, each in args_key])
+    kwargs = {k: v for k, _, v in kwargs_key}
+    return _solve_rule(rule_ref(), args, kwargs)
+
+
+def _solve_rule(rule, args, kwargs):
+    values = _solve_values(_field_tokens(rule), args, kwargs)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Solving rule '{}' with values {}".format(
+            rule.name, dict(zip(rule.fields_with_digits, values))
+        ))
+    return rule.compose(values)
+
+
+def _field_tokens(rule):
+    return [
+        (field, f, tokens.get_token(field))
+        for field, f in zip(rule.fields, rule.fields_with_digits)
+    ]
+
+
+def _solve_values(field_tokens, args, kwargs):
+    # * Solved values are returned in field order, ready for Rule.compose()
+    values = [None] * len(field_tokens)
     i = 0
-    fields_inc = 0
-    for f in fields_with_digits:
-        token = tokens.get_token(rule.fields[fields_inc])
-        if token:
-            # Explicitly passed as keyword argument
-            if kwargs.get(f) is not None:
-                values[f] = token.solve(kwargs.get(f))
-                fields_inc += 1
-                continue
-            # Explicitly passed as keyword argument without repetitive digits
-            # Use passed argument for all field repetitions
-            elif kwargs.get(rule.fields[fields_inc]) is not None:
-                values[f] = token.solve(kwargs.get(rule.fields[fields_inc]))
-                fields_inc += 1
-                continue
-            elif token.required and kwargs.get(f) is None and len(args) == 0:
-                raise SolvingError("Token {} is required.")
-            # Not required and not passed as keyword argument
-            elif not token.required and kwargs.get(f) is None:
-                values[f] = token.solve()
-                fields_inc += 1
-                continue
-            # Implicitly passed as positional argument
-            try:
-                values[f] = token.solve(args[i])
-                i += 1
-                fields_inc += 1
-                continue
-            except IndexError as why:
-                raise SolvingError("Missing argument for field '{}'\n{}".format(f, why))
-    logger.debug("Solving rule '{}' with values {}".format(rule.name, values))
-    return rule.solve(**values)
+    for index, (field, f, token) in enumerate(field_tokens):
+        if not token:
+            raise SolvingError("Token '{}' not found for field '{}'".format(field, f))
+        required = token.required
+        # Explicitly passed as keyword argument
+        value = kwargs.get(f)
+        if value is not None:
+            values[index] = token.solve(value)
+            continue
+        # Explicitly passed as keyword argument without repetitive digits
+        # Use passed argument for all field repetitions
+        value = kwargs.get(field)
+        if value is not None:
+            values[index] = token.solve(value)
+            continue
+        elif required and len(args) == 0:
+            raise SolvingError("Token {} is required.".format(f))
+        # Not required and not passed as keyword argument
+        elif not required:
+            values[index] = token.solve()
+            continue
+        # Implicitly passed as positional argument
+        try:
+            values[index] = token.solve(args[i])
+            i += 1
+        except IndexError as why:
+            raise SolvingError("Missing argument for field '{}'\n{}".format(f, why))
+    return values
 
 
 def get_repo():
@@ -168,23 +247,26 @@ def save_session(repo=None):
             os.mkdir(repo)
         except (IOError, OSError) as why:
             raise why
-    # save tokens
-    for name, token in six.iteritems(tokens.get_tokens()):
+    token_names = list(tokens.get_tokens().keys())
+    for name in token_names:
         logger.debug("Saving token: '{}' in {}".format(name, repo))
-        tokens.save_token(name, repo)
-    # save rules
-    for name, rule in six.iteritems(rules.get_rules()):
+    rule_names = list()
+    for name, rule in rules.get_rules().items():
         if not isinstance(rule, rules.Rule):
             continue
         logger.debug("Saving rule: '{}' in {}".format(name, repo))
-        rules.save_rule(name, repo)
+        rule_names.append(name)
+    # * Each token and rule is its own file, so writes can overlap
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(tokens.save_token, token_names, repeat(repo)))
+        list(executor.map(rules.save_rule, rule_names, repeat(repo)))
     # extra configuration
     active = rules.get_active_rule()
     config = {"set_active_rule": active.name if active else None}
     filepath = os.path.join(repo, "naming.conf")
     logger.debug("Saving active rule: {} in {}".format(active.name, filepath))
-    with open(filepath, "w") as fp:
-        json.dump(config, fp, indent=4)
+    with open(filepath, "wb") as fp:
+        serialize.dump(config, fp, indent=True)
     return True
 
 
@@ -208,20 +290,46 @@ def load_session(repo=None):
         return False
     rules.reset_rules()
     tokens.reset_tokens()
+    clear_solve_cache()
     # tokens and rules
-    for dirpath, dirnames, filenames in os.walk(repo):
-        for filename in filenames:
-            filepath = os.path.join(dirpath, filename)
-            if filename.endswith(".token"):
-                logger.debug("Loading token: {}".format(filepath))
-                tokens.load_token(filepath)
-            elif filename.endswith(".rule"):
-                logger.debug("Loading rule: {}".format(filepath))
-                rules.load_rule(filepath)
-    # extra configuration
-    if os.path.exists(namingconf):
-        logger.debug("Loading active rule: {}".format(namingconf))
-        with open(namingconf) as fp:
-            config = json.load(fp)
-        rules.set_active_rule(config.get('set_active_rule'))
+    token_paths = list()
+    rule_paths = list()
+    directories = [repo]
+    while directories:
+        subdirectories = list()
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.name.endswith(".token"):
+                    logger.debug("Loading token: {}".format(entry.path))
+                    token_paths.append(entry.path)
+                elif entry.name.endswith(".rule"):
+                    logger.debug("Loading rule: {}".format(entry.path))
+                    rule_paths.append(entry.path)
+        # * Same order as os.walk top-down: a directory's files, then each subdirectory
+        # in full, so files in subdirectories override the same names found above them
+        directories.extend(reversed(subdirectories))
+    # * Each token and rule is its own file, so reads can overlap. Registering happens
+    # here in walk order, so duplicated names always resolve to the same file.
+    with ThreadPoolExecutor() as executor:
+        loaded_tokens = list(executor.map(tokens._read_token, token_paths))
+        loaded_rules = list(executor.map(rules._read_rule, rule_paths))
+    for filepath, token in zip(token_paths, loaded_tokens):
+        if token is None:
+            continue
+        if tokens.has_token(token.name):
+            logger.warning("Token '{}' found more than once, using {}".format(token.name, filepath))
+        tokens._register_token(token)
+    for filepath, rule in zip(rule_paths, loaded_rules):
+        if rule is None:
+            continue
+        if rules.has_rule(rule.name):
+            logger.warning("Rule '{}' found more than once, using {}".format(rule.name, filepath))
+        rules._register_rule(rule)
+    # extra configuration, its existence was validated above
+    logger.debug("Loading active rule: {}".format(namingconf))
+    with open(namingconf, "rb") as fp:
+        config = serialize.load(fp)
+    rules.set_active_rule(config.get('set_active_rule'))
     return True
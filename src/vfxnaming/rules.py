@@ -1,18 +1,19 @@
 # coding=utf-8
-from __future__ import absolute_import, print_function
-
 import re
-import json
 import os
+import logging
 import sys
 import functools
 from collections import defaultdict
+import vfxnaming.serialize as serialize
 from vfxnaming.serialize import Serializable
 from vfxnaming.tokens import get_token
 from vfxnaming.logger import logger
 from vfxnaming.error import ParsingError, SolvingError
 
 _rules = {'_active': None}
+# Resolved Rule object for _rules['_active'], kept in sync by the functions below
+_active_rule = None
 
 
 class Rule(Serializable):
@@ -34,15 +35,29 @@ class Rule(Serializable):
 
     __FIELDS_REGEX = re.compile(r'{(.+?)}')
     __PATTERN_SEPARATORS_REGEX = re.compile(r'(}[_\-\.:\|/\\]{|[_\-\.:\|/\\]{|}[_\-\.:\|/\\])')
-    __SEPARATORS_REGEX = re.compile(r'[_\-\.:\|/\\]')
+    __SEPARATORS = ('_', '-', '.', ':', '|', '/', '\\')
     ANCHOR_START, ANCHOR_END, ANCHOR_BOTH = (1, 2, 3)
+    __slots__ = (
+        '_name', '_pattern', '_anchor', '_regex', '_fields', '_fields_with_digits',
+        '_digits_pattern', '_literals', '_expected_separators', '_parse_keys',
+        '__weakref__'
+    )
 
     def __init__(self, name, pattern, anchor=ANCHOR_START):
-        super(Rule, self).__init__()
+        super().__init__()
         self._name = name
         self._pattern = pattern
         self._anchor = anchor
         self._regex = self.__build_regex()
+        # Pattern is fixed for the lifetime of the Rule, so derived data is built once.
+        # Field names are interned as they are used as keys for token and kwargs lookups.
+        self._fields = tuple([sys.intern(each) for each in self.__FIELDS_REGEX.findall(self._pattern)])
+        self._fields_with_digits = self.__fields_with_digits()
+        self._digits_pattern = self.__digits_pattern()
+        # Hardcoded text around fields. e.g.: '{side}-{region}.png' -> ('', '-', '.png')
+        self._literals = tuple(self.__FIELDS_REGEX.split(self._pattern)[::2])
+        self._expected_separators = len(self.__PATTERN_SEPARATORS_REGEX.findall(self._pattern))
+        self._parse_keys = self.__parse_keys()
 
     def data(self):
         """Collect all data for this object instance.
@@ -91,7 +106,7 @@ class Rule(Serializable):
         result = None
 
         try:
-            result = self.__digits_pattern().format(**values)
+            result = self._digits_pattern.format_map(values)
         except KeyError as why:
             raise SolvingError(
                 "Arguments passed do not match with naming rule fields {}\n{}".format(
@@ -101,6 +116,32 @@ class Rule(Serializable):
 
         return result
 
+    def compose(self, values):
+        """Build a name from already solved values, given in the same order as
+        this Rule's fields.
+
+        Args:
+            values (list): Solved value for each field. e.g.: ['C', 'helmet', '001', 'MSH']
+
+        Raises:
+            SolvingError: Values count does not match with rule fields count.
+
+        Returns:
+            str: A string with the resulting name.
+        """
+        if len(values) != len(self._fields):
+            raise SolvingError(
+                "Arguments passed do not match with naming rule fields {}\n{} values for {} fields".format(
+                    self._pattern, len(values), len(self._fields)
+                )
+            )
+        literals = self._literals
+        parts = [literals[0]]
+        for value, literal in zip(values, literals[1:]):
+            parts.append(str(value))
+            parts.append(literal)
+        return "".join(parts)
+
     def parse(self, name):
         """Build and return dictionary with keys as tokens and values as given names.
 
@@ -115,54 +156,74 @@ class Rule(Serializable):
             dict: A dictionary with keys as tokens and values as given name parts.
             e.g.: {'side':'C', 'part':'helmet', 'number': 1, 'type':'MSH'}
         """
-        expected_separators = self.__PATTERN_SEPARATORS_REGEX.findall(self._pattern)
-        if len(expected_separators) <= 0:
+        if self._expected_separators <= 0:
             logger.warning(
                 "No separators used for rule '{}', parsing is not possible.".format(
                     self.name
                 )
             )
             return None
-        name_separators = self.__SEPARATORS_REGEX.findall(name)
-        if len(expected_separators) <= len(name_separators):
+        # Count separators in C with str.count instead of building a list of matches
+        name_separators = sum(map(name.count, self.__SEPARATORS))
+        if self._expected_separators <= name_separators:
             retval = dict()
             match = self._regex.search(name)
             if match:
-                name_parts = sorted(match.groupdict().items())
-                logger.debug(
-                    "Name parts: {}".format(
-                        ", ".join(["('{}': '{}')".format(k[:-3], v) for k, v in name_parts])
-                    )
-                )
-                repeated_fields = dict()
-                for each in self.fields:
-                    if each not in repeated_fields.keys():
-                        if self.fields.count(each) > 1:
-                            repeated_fields[each] = 1
-                if repeated_fields:
+                # * Only build the per-field message when it's going to be logged
+                if logger.isEnabledFor(logging.DEBUG):
+                    name_parts = match.groupdict().items()
                     logger.debug(
-                        "Repeated tokens: {}".format(", ".join(repeated_fields.keys()))
+                        "Name parts: {}".format(
+                            ", ".join(["('{}': '{}')".format(k[:-3], v) for k, v in name_parts])
+                        )
                     )
-
-                for key, value in name_parts:
-                    # Strip number that was added to make group name unique
-                    token_name = key[:-3]
+                for group_name, token_name, key in self._parse_keys:
                     token = get_token(token_name)
-                    if not token:
-                        continue
-                    if token_name in repeated_fields.keys():
-                        counter = repeated_fields.get(token_name)
-                        repeated_fields[token_name] = counter + 1
-                        token_name = "{}{}".format(token_name, counter)
-                    retval[token_name] = token.parse(value)
+                    if token:
+                        value = match.group(group_name)
+                        parsed = token.parse(value)
+                        # TokenNumber returns None when no number can be found in the value
+                        if parsed is None:
+                            raise ParsingError(
+                                "Value '{}' for field '{}' in name '{}' is not a valid number.".format(
+                                    value, key, name
+                                )
+                            )
+                        retval[key] = parsed
             return retval
         else:
             raise ParsingError(
                 "Separators count mismatch between given name '{}':'{}' and rule's pattern '{}':'{}'.".format(
-                    name, len(name_separators), self._pattern, len(expected_separators)
+                    name, name_separators, self._pattern, self._expected_separators
                 )
             )
 
+    def __parse_keys(self):
+        # * Map each regex group to its token and to the key used in parse results.
+        # Repeated tokens get an incremental digit so they can be differentiated.
+        group_names = sorted(self._regex.groupindex.keys(), key=self._regex.groupindex.get)
+        # Strip number that was added to make group name unique
+        token_names = [each[:-3] for each in group_names]
+        parse_keys = list()
+        for group_name, token_name in zip(group_names, token_names):
+            key = token_name
+            if token_names.count(token_name) > 1:
+                key = "{}{}".format(token_name, int(group_name[-3:]))
+            parse_keys.append((group_name, token_name, key))
+        return tuple(parse_keys)
+
+    def __fields_with_digits(self):
+        # * This accounts for those cases where a token is used more than once in a rule
+        counters = dict()
+        fields_with_digits = list()
+        for each in self._fields:
+            if self._fields.count(each) > 1:
+                counters[each] = counters.get(each, 0) + 1
+                fields_with_digits.append(sys.intern("{}{}".format(each, counters[each])))
+            else:
+                fields_with_digits.append(each)
+        return tuple(fields_with_digits)
+
     def __build_regex(self):
         # ? Taken from Lucidity by Martin Pengelly-Phillips
         # Escape non-placeholder components
@@ -198,10 +259,7 @@ class Rule(Serializable):
             else:
                 _, value, traceback = sys.exc_info()
                 message = 'Invalid pattern: {0}'.format(value)
-                if sys.version_info[0] == 3:
-                    raise ValueError(message).with_traceback(traceback)
-                elif sys.version_info[0] == 2:
-                    raise ValueError(message, traceback)
+                raise ValueError(message).with_traceback(traceback)
 
         return compiled
 
@@ -269,7 +327,16 @@ class Rule(Serializable):
         Returns:
             [tuple]: Tuple of all Tokens found in this Rule's pattern
         """
-        return tuple(self.__FIELDS_REGEX.findall(self._pattern))
+        return self._fields
+
+    @property
+    def fields_with_digits(self):
+        """
+        Returns:
+            [tuple]: Tuple of all Tokens found in this Rule's pattern, with an incremental
+            digit added to repeated Tokens. e.g.: ('side1', 'region', 'side2')
+        """
+        return self._fields_with_digits
 
     @property
     def regex(self):
@@ -307,8 +374,9 @@ def add_rule(name, pattern, anchor=Rule.ANCHOR_START):
     Returns:
         Rule: The Rule object instance created for given name and fields.
     """
+    name = sys.intern(name)
     rule = Rule(name, pattern, anchor)
-    _rules[name] = rule
+    _register_rule(rule)
     if get_active_rule() is None:
         set_active_rule(name)
         logger.debug("No active rule found, setting this one as active: {}".format(name))
@@ -324,7 +392,10 @@ def remove_rule(name):
     Returns:
         bool: True if successful, False if a rule name was not found.
     """
+    global _active_rule
     if has_rule(name):
+        if _active_rule is _rules[name]:
+            _active_rule = None
         del _rules[name]
         return True
     return False
@@ -348,8 +419,10 @@ def reset_rules():
     Returns:
         bool: True if clearing was successful.
     """
+    global _active_rule
     _rules.clear()
     _rules['_active'] = None
+    _active_rule = None
     return True
 
 
@@ -360,8 +433,7 @@ def get_active_rule():
     Returns:
         Rule: Rule object instance for currently active Rule.
     """
-    name = _rules.get('_active')
-    return _rules.get(name)
+    return _active_rule
 
 
 def set_active_rule(name):
@@ -374,8 +446,10 @@ def set_active_rule(name):
     Returns:
         bool: True if successful, False otherwise.
     """
+    global _active_rule
     if has_rule(name):
         _rules['_active'] = name
+        _active_rule = _rules[name]
         return True
     return False
 
@@ -417,8 +491,8 @@ def save_rule(name, directory):
         return False
     file_name = "{}.rule".format(name)
     filepath = os.path.join(directory, file_name)
-    with open(filepath, "w") as fp:
-        json.dump(rule.data(), fp)
+    with open(filepath, "wb") as fp:
+        serialize.dump(rule.data(), fp)
     return True
 
 
@@ -431,15 +505,28 @@ def load_rule(filepath):
     Returns:
         bool: True if successful, False if .rule wasn't found.
     """
-    if not os.path.isfile(filepath):
-        return False
-    try:
-        with open(filepath) as fp:
-            data = json.load(fp)
-    except Exception:
-        return False
-    new_rule = Rule.from_data(data)
+    new_rule = _read_rule(filepath)
     if new_rule:
-        _rules[new_rule.name] = new_rule
+        _register_rule(new_rule)
         return True
     return False
+
+
+def _read_rule(filepath):
+    # * Creates the rule without adding it to the session, safe to call from worker threads
+    if not os.path.isfile(filepath):
+        return None
+    try:
+        with open(filepath, "rb") as fp:
+            data = serialize.load(fp)
+    except Exception:
+        return None
+    return Rule.from_data(data)
+
+
+def _register_rule(rule):
+    # * Replacing the active rule by name keeps it active with the new object
+    global _active_rule
+    _rules[rule.name] = rule
+    if rule.name == _rules.get('_active'):
+        _active_rule = rule
@@ -1,17 +1,32 @@
 # coding=utf-8
-from __future__ import absolute_import, print_function
+import json
+import functools
 
-import copy
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
-class Serializable(object):
+class Serializable:
+    __slots__ = ()
+
     def data(self):
         """Collect all data for this object instance.
 
         Returns:
             dict: {attribute:value}
         """
-        retval = copy.deepcopy(self.__dict__)
+        attributes = {name: getattr(self, name) for name in _slot_names(type(self))}
+        # Subclasses without __slots__ keep their state in __dict__
+        attributes.update(getattr(self, "__dict__", {}))
+        retval = dict()
+        for name, value in attributes.items():
+            # Attributes hold strings, ints and flat dicts of those,
+            # so copying dicts is enough to not share state
+            if isinstance(value, dict):
+                value = dict(value)
+            retval[name] = value
         retval["_Serializable_classname"] = type(self).__name__
         retval["_Serializable_version"] = "1.0"
         return retval
@@ -35,5 +50,63 @@ class Serializable(object):
             del data["_Serializable_version"]
 
         this = cls(None)
-        this.__dict__.update(data)
+        slot_names = _slot_names(cls)
+        instance_dict = getattr(this, "__dict__", None)
+        for name, value in data.items():
+            if name in slot_names:
+                setattr(this, name, value)
+            elif instance_dict is not None:
+                instance_dict[name] = value
         return this
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_names(cls):
+    """Collect attribute names declared in __slots__ through the class hierarchy.
+    Cached per class, as __slots__ can't change after a class is created.
+
+    Returns:
+        tuple: Attribute names, base classes first.
+    """
+    names = list()
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend([
+            each for each in slots
+            if each not in names and each not in ("__dict__", "__weakref__")
+        ])
+    return tuple(names)
+
+
+def dump(data, fp, indent=False):
+    """Write data as JSON to a file opened in binary mode. Uses orjson when
+    it's installed, falling back to the standard json module otherwise.
+
+    Args:
+        data (dict): JSON serializable data.
+
+        fp (file): File object opened for writing bytes.
+
+        indent (bool, optional): Pretty print the output. Defaults to False.
+    """
+    if orjson is not None:
+        fp.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None))
+    else:
+        fp.write(json.dumps(data, indent=2 if indent else None).encode("utf-8"))
+
+
+def load(fp):
+    """Read JSON data from a file opened in binary mode. Uses orjson when
+    it's installed, falling back to the standard json module otherwise.
+
+    Args:
+        fp (file): File object opened for reading bytes.
+
+    Returns:
+        dict: Deserialized data.
+    """
+    if orjson is not None:
+        return orjson.loads(fp.read())
+    return json.loads(fp.read())
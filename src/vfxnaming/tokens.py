@@ -1,19 +1,22 @@
 # coding=utf-8
-from __future__ import absolute_import, print_function
-
-import copy
-import json
 import os
+import re
+import sys
+import vfxnaming.serialize as serialize
 from vfxnaming.serialize import Serializable
 from vfxnaming.logger import logger
 from vfxnaming.error import TokenError
 
-import six
-
 _tokens = dict()
+# Bumped on every change to the tokens registry, so cached solved names can tell they're stale
+_generation = 0
+# Non-digit prefix, digits, non-digit suffix. e.g.: v0025rt
+_NUMBER_REGEX = re.compile(r'\D*(\d+)\D*$')
 
 
 class Token(Serializable):
+    __slots__ = ('_name', '_default', '_options', '_reverse')
+
     def __init__(self, name):
         """Tokens are the meaningful parts of a naming rule. A token can be required,
         meaning fully typed by the user, or can have a set of default options preconfigured.
@@ -25,10 +28,22 @@ class Token(Serializable):
             name (str): Name that best describes the Token, this will be used as a way
             to invoke the Token object.
         """
-        super(Token, self).__init__()
+        super().__init__()
         self._name = name
         self._default = None
         self._options = dict()
+        # {abbreviation:full_name} lookup for parsing, built lazily from options
+        self._reverse = None
+
+    def data(self):
+        """Collect all data for this object instance.
+
+        Returns:
+            dict: {attribute:value}
+        """
+        retval = super().data()
+        del retval["_reverse"]
+        return retval
 
     def add_option(self, key, value):
         """Add an option pair to this Token.
@@ -42,6 +57,7 @@ class Token(Serializable):
         """
         if key not in self._options.keys():
             self._options[key] = value
+            self._reverse = None
             return True
         logger.debug(
             "Option '{}':'{}' already exists in Token '{}'. "
@@ -61,6 +77,7 @@ class Token(Serializable):
         """
         if key in self._options.keys():
             self._options[key] = value
+            self._reverse = None
             return True
         logger.debug(
             "Option '{}':'{}' doesn't exist in Token '{}'. "
@@ -79,6 +96,7 @@ class Token(Serializable):
         """
         if key in self._options.keys():
             del self._options[key]
+            self._reverse = None
             return True
         logger.debug(
             "Option '{}':'{}' doesn't exist in Token '{}'. ".format(
@@ -109,7 +127,7 @@ class Token(Serializable):
         Returns:
             [type]: [description]
         """
-        if value in self._options.values():
+        if value in self.__reverse_options():
             return True
         return False
 
@@ -130,11 +148,12 @@ class Token(Serializable):
             str: If Token has options, the abbreviation for given name is returned
             str: If nothing is passed and Token has options, default option is returned.
         """
-        if self.required and name:
+        required = self.required
+        if required and name:
             return name
-        elif self.required and name is None:
+        elif required and name is None:
             raise TokenError("Token {} is required. name parameter must be passed.".format(self.name))
-        elif not self.required and name:
+        elif not required and name:
             if name not in self._options.keys():
                 raise TokenError(
                     "name '{}' not found in Token '{}'. Options: {}".format(
@@ -142,7 +161,7 @@ class Token(Serializable):
                         )
                     )
             return self._options.get(name)
-        elif not self.required and not name:
+        elif not required and not name:
             return self._options.get(self.default)
 
     def parse(self, value):
@@ -156,18 +175,27 @@ class Token(Serializable):
         """
         if self.required:
             return value
-        elif not self.required and len(self._options) >= 1:
-            for k, v in six.iteritems(self._options):
-                if v == value:
-                    return k
+        reverse = self.__reverse_options()
+        if value in reverse:
+            return reverse[value]
         raise TokenError("Value '{}' not found in Token '{}'. Options: {}".format(
                 value, self.name, ', '.join(self._options.values())
             )
         )
 
+    def __reverse_options(self):
+        if self._reverse is None:
+            reverse = dict()
+            for k, v in self._options.items():
+                # First option wins when abbreviations are repeated
+                reverse.setdefault(v, k)
+            self._reverse = reverse
+        return self._reverse
+
     @property
     def required(self):
-        return self.default is None
+        # Same as self.default is None, without resolving the default option
+        return self._default is None and not self._options
 
     @property
     def name(self):
@@ -179,14 +207,14 @@ class Token(Serializable):
 
     @property
     def default(self):
-        """If Token has options, one of them will be default. Eitther passed by the user,
-        or simply the first found item in options.
+        """If Token has options, one of them will be default. Either passed by the user,
+        or simply the first option full name in alphabetical order.
 
         Returns:
             str: Default option value
         """
-        if self._default is None and len(self._options) >= 1:
-            self._default = sorted(list(self._options.keys()))[0]
+        if self._default is None and self._options:
+            self._default = min(self._options.keys())
         return self._default
 
     @default.setter
@@ -195,10 +223,13 @@ class Token(Serializable):
 
     @property
     def options(self):
-        return copy.deepcopy(self._options)
+        return dict(self._options)
 
 
 class TokenNumber(Serializable):
+    __DEFAULT_OPTIONS = {"prefix": "", "suffix": "", "padding": 3}
+    __slots__ = ('_name', '_default', '_options')
+
     def __init__(self, name):
         """Token for numbers with the ability to handle pure digits and version like strings
         (e.g.: v0025) with padding settings.
@@ -209,10 +240,28 @@ class TokenNumber(Serializable):
             name (str): Name that best describes the TokenNumber, this will be used as a way
             to invoke the Token object.
         """
-        super(TokenNumber, self).__init__()
+        super().__init__()
         self._name = name
         self._default = 1
-        self._options = {"prefix": "", "suffix": "", "padding": 3}
+        self._options = dict(self.__DEFAULT_OPTIONS)
+
+    @classmethod
+    def from_data(cls, data):
+        """Create object instance from give data. Options missing from the data
+        (e.g.: older or hand written .token files) get their default values.
+
+        Args:
+            data (dict): {attribute:value}
+
+        Returns:
+            Serializable: Object instance for TokenNumber.
+        """
+        this = super().from_data(data)
+        if this is not None:
+            options = dict(cls.__DEFAULT_OPTIONS)
+            options.update(this._options)
+            this._options = options
+        return this
 
     def solve(self, number):
         """Solve for number with prefix, suffix and padding parameter found in the instance
@@ -224,8 +273,10 @@ class TokenNumber(Serializable):
         Returns:
             str: The solved string to be used in the name
         """
-        numberStr = str(number).zfill(self.padding)
-        return '{}{}{}'.format(self.prefix, numberStr, self.suffix)
+        options = self._options
+        return '{}{}{}'.format(
+            options['prefix'], str(number).zfill(options['padding']), options['suffix']
+        )
 
     def parse(self, value):
         """Get metatada (number) for given value in name. e.g.: v0025 will return 25
@@ -234,35 +285,14 @@ class TokenNumber(Serializable):
             value (str): String value taken from a name with digits in it.
 
         Returns:
-            int: Number found in the given string.
+            int: Number found in the given string. None if no number is found,
+            or if digits are found in more than one place. e.g.: v2x003
         """
         if value.isdigit():
             return int(value)
-        else:
-            prefix_index = 0
-            for each in value[::1]:
-                if each.isdigit() and prefix_index == 0:
-                    prefix_index = -1
-                    break
-                elif each.isdigit() and prefix_index > 0:
-                    break
-                prefix_index += 1
-
-            suffix_index = 0
-            for each in value[::-1]:
-                if each.isdigit() and suffix_index == 0:
-                    suffix_index = -1
-                    break
-                elif each.isdigit() and suffix_index > 0:
-                    break
-                suffix_index += 1
-
-            if prefix_index == -1 and suffix_index >= 0:
-                return int(value[:-suffix_index])
-            elif prefix_index >= 0 and suffix_index == -1:
-                return int(value[prefix_index:])
-            elif prefix_index >= 0 and suffix_index >= 0:
-                return int(value[prefix_index:-suffix_index])
+        match = _NUMBER_REGEX.match(value)
+        if match:
+            return int(match.group(1))
 
     @property
     def name(self):
@@ -314,7 +344,11 @@ class TokenNumber(Serializable):
 
     @property
     def options(self):
-        return copy.deepcopy(self._options)
+        return dict(self._options)
+
+
+# Token types that can be loaded from .token files, by serialized class name
+_token_classes = {cls.__name__: cls for cls in (Token, TokenNumber)}
 
 
 def add_token(name, **kwargs):
@@ -334,24 +368,25 @@ def add_token(name, **kwargs):
     Returns:
         Token: The Token object instance created for given name and fields.
     """
+    name = sys.intern(name)
     token = Token(name)
-    for k, v in six.iteritems(kwargs):
+    for k, v in kwargs.items():
         if k == "default":
             continue
         token.add_option(k, v)
     if "default" in kwargs.keys():
-        extract_default = copy.deepcopy(kwargs)
+        extract_default = dict(kwargs)
         del extract_default["default"]
         if kwargs.get('default') in extract_default.keys():
             token.default = kwargs.get('default')
         elif kwargs.get('default') in extract_default.values():
-            for k, v in six.iteritems(extract_default):
+            for k, v in extract_default.items():
                 if v == kwargs.get('default'):
                     token.default = k
                     break
         else:
             raise TokenError("Default value must match one of the options passed.")
-    _tokens[name] = token
+    _register_token(token)
     return token
 
 
@@ -373,11 +408,12 @@ def add_token_number(name, prefix=str(), suffix=str(), padding=3):
     Returns:
         TokenNumber: The TokenNumber object instance created for given name and fields.
     """
+    name = sys.intern(name)
     token = TokenNumber(name)
     token.prefix = prefix
     token.suffix = suffix
     token.padding = padding
-    _tokens[name] = token
+    _register_token(token)
     return token
 
 
@@ -392,6 +428,7 @@ def remove_token(name):
     """
     if has_token(name):
         del _tokens[name]
+        _bump_generation()
         return True
     return False
 
@@ -415,6 +452,7 @@ def reset_tokens():
         bool: True if clearing was successful.
     """
     _tokens.clear()
+    _bump_generation()
     return True
 
 
@@ -454,8 +492,8 @@ def save_token(name, directory):
         return False
     file_name = "{}.token".format(name)
     filepath = os.path.join(directory, file_name)
-    with open(filepath, "w") as fp:
-        json.dump(token.data(), fp)
+    with open(filepath, "wb") as fp:
+        serialize.dump(token.data(), fp)
     return True
 
 
@@ -467,17 +505,43 @@ def load_token(filepath):
         filepath (str): Path to existing .token file location
 
     Returns:
-        bool: True if successful, False if .token wasn't found.
+        bool: True if successful, False if .token wasn't found or has an unknown token type.
     """
-    if not os.path.isfile(filepath):
+    token = _read_token(filepath)
+    if token is None:
         return False
+    _register_token(token)
+    return True
+
+
+def _read_token(filepath):
+    # * Creates the token without adding it to the session, safe to call from worker threads
+    if not os.path.isfile(filepath):
+        return None
     try:
-        with open(filepath) as fp:
-            data = json.load(fp)
+        with open(filepath, "rb") as fp:
+            data = serialize.load(fp)
     except Exception:
-        return False
+        return None
     class_name = data.get("_Serializable_classname")
     logger.debug("Loading token type: {}".format(class_name))
-    token = eval("{}.from_data(data)".format(class_name))
+    token_class = _token_classes.get(class_name)
+    if token_class is None:
+        logger.warning("Unknown token type '{}' in {}".format(class_name, filepath))
+        return None
+    token = token_class.from_data(data)
+    if not isinstance(token.name, str):
+        logger.warning("Token without a valid name in {}".format(filepath))
+        return None
+    token.name = sys.intern(token.name)
+    return token
+
+
+def _register_token(token):
     _tokens[token.name] = token
-    return True
+    _bump_generation()
+
+
+def _bump_generation():
+    global _generation
+    _generation += 1
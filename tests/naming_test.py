@@ -1,15 +1,16 @@
 # coding=utf-8
-from __future__ import absolute_import, print_function
-
 from vfxnaming import naming as n
 import vfxnaming.rules as rules
 import vfxnaming.tokens as tokens
 from vfxnaming import logger
 from vfxnaming.error import ParsingError, SolvingError, TokenError
+from vfxnaming.serialize import Serializable
 
+import gc
 import os
 import pytest
 import tempfile
+import weakref
 
 # Debug logging
 logger.init_logger()
@@ -89,6 +90,72 @@ class Test_Solve:
         solved = n.solve('chars', 1)
         assert solved == name
 
+    def test_solve_many(self):
+        names = ['natural_custom_chars_001_LGT', 'dramatic_rim_env_012_ANI']
+        solved = n.solve_many([
+            dict(whatAffects='chars', digits=1),
+            dict(category='dramatic', function='rim', whatAffects='env', digits=12, type='animation')
+        ])
+        assert solved == names
+
+    def test_solve_many_missing_required_token(self):
+        with pytest.raises(SolvingError) as exception:
+            n.solve_many([dict(whatAffects='chars', digits=1), dict(digits=2)])
+        assert str(exception.value).startswith("Token") is True
+
+    def test_solve_cached(self):
+        n.clear_solve_cache()
+        name = 'natural_custom_chars_001_LGT'
+        assert n.solve_cached('chars', 1) == name
+        assert n._solve_cached.cache_info().hits == 0
+        assert n.solve_cached('chars', 1) == name
+        assert n._solve_cached.cache_info().hits == 1
+
+        # Direct option edits are not tracked until the cache is cleared
+        tokens.get_token('function').update_option('custom', 'CST')
+        assert n.solve_cached('chars', 1) == name
+        n.clear_solve_cache()
+        assert n.solve_cached('chars', 1) == 'natural_CST_chars_001_LGT'
+
+        # Registry changes invalidate cached names
+        tokens.add_token('type', lighting='LIT', default='lighting')
+        assert n.solve_cached('chars', 1) == 'natural_CST_chars_001_LIT'
+        tokens.remove_token('type')
+        with pytest.raises(SolvingError):
+            n.solve_cached('chars', 1)
+        tokens.add_token_number('digits', padding=4)
+        tokens.add_token('type', lighting='LGT', default='lighting')
+        assert n.solve_cached('chars', 1) == 'natural_CST_chars_0001_LGT'
+
+        rules.add_rule('lights', '{whatAffects}_{digits}')
+        assert n.solve_cached('chars', 1) == 'chars_0001'
+
+    def test_solve_cached_no_active_rule(self):
+        rules.reset_rules()
+        with pytest.raises(SolvingError) as exception:
+            n.solve_cached('chars', 1)
+        assert str(exception.value).startswith("No active rule") is True
+
+    def test_solve_cached_typed_arguments(self):
+        n.clear_solve_cache()
+        assert n.solve_cached('chars', digits=1) == 'natural_custom_chars_001_LGT'
+        assert n.solve_cached('chars', digits=1.0) == n.solve('chars', digits=1.0)
+        assert n.solve_cached('chars', digits=True) == n.solve('chars', digits=True)
+
+    def test_solve_cached_unhashable(self):
+        n.clear_solve_cache()
+        solved = n.solve_cached(['chars'], 1)
+        assert solved == n.solve(['chars'], 1)
+        assert n._solve_cached.cache_info().currsize == 0
+
+    def test_solve_cached_releases_rules(self):
+        n.clear_solve_cache()
+        n.solve_cached('chars', 1)
+        rule_ref = weakref.ref(rules.get_active_rule())
+        rules.reset_rules()
+        gc.collect()
+        assert rule_ref() is None
+
 
 class Test_Parse:
     @pytest.fixture(autouse=True)
@@ -309,6 +376,22 @@ class Test_Serialization:
         rule2 = rules.Rule.from_data(rule1.data())
         assert rule1.data() == rule2.data()
 
+    def test_serializable_without_slots(self):
+        class Foo(Serializable):
+            def __init__(self, name):
+                self.name = name
+                self.x = None
+
+        foo = Foo('foo')
+        foo.x = 5
+        data = foo.data()
+        assert data['name'] == 'foo'
+        assert data['x'] == 5
+
+        loaded = Foo.from_data(data)
+        assert loaded.name == 'foo'
+        assert loaded.x == 5
+
     def test_validation(self):
         token = tokens.add_token(
             'function', key='key',
@@ -368,6 +451,40 @@ class Test_Serialization:
         tokens.load_token(filepath)
         assert tokens.has_token('test') is True
 
+    def test_load_token_number_missing_options(self):
+        tempdir = tempfile.mkdtemp()
+        filepath = os.path.join(tempdir, "test.token")
+        with open(filepath, "w") as fp:
+            fp.write(
+                '{"_name": "test", "_options": {"prefix": "v"}, "_Serializable_classname": "TokenNumber"}'
+            )
+
+        assert tokens.load_token(filepath) is True
+        assert tokens.get_token('test').solve(7) == 'v007'
+
+    def test_load_token_unknown_type(self):
+        tokens.add_token_number('test')
+        tempdir = tempfile.mkdtemp()
+        tokens.save_token('test', tempdir)
+        filepath = os.path.join(tempdir, "test.token")
+        with open(filepath) as fp:
+            data = fp.read()
+        with open(filepath, "w") as fp:
+            fp.write(data.replace('"TokenNumber"', '"__import__"'))
+
+        tokens.reset_tokens()
+        assert tokens.load_token(filepath) is False
+        assert tokens.has_token('test') is False
+
+    def test_load_token_without_name(self):
+        tempdir = tempfile.mkdtemp()
+        filepath = os.path.join(tempdir, "test.token")
+        with open(filepath, "w") as fp:
+            fp.write('{"_options": {}, "_Serializable_classname": "Token"}')
+
+        assert tokens.load_token(filepath) is False
+        assert tokens.get_tokens() == {}
+
     def test_save_load_session(self):
         tokens.add_token('whatAffects')
         tokens.add_token_number('digits')
@@ -413,3 +530,20 @@ class Test_Serialization:
         assert rules.has_rule('lights') is True
         assert rules.has_rule('test') is True
         assert rules.get_active_rule().name == 'lights'
+
+    def test_load_session_duplicated_names(self):
+        for subdir_name in ('a', 'z'):
+            tokens.reset_tokens()
+            rules.reset_rules()
+            repo = tempfile.mkdtemp()
+            tokens.add_token('test', key='KEY', default='key')
+            rules.add_rule('lights', '{test}_{test}')
+            n.save_session(repo)
+            subdir = os.path.join(repo, subdir_name)
+            os.mkdir(subdir)
+            tokens.add_token('test', key=subdir_name, default='key')
+            tokens.save_token('test', subdir)
+
+            for _ in range(3):
+                n.load_session(repo)
+                assert tokens.get_token('test').solve('key') == subdir_name
@@ -1,6 +1,4 @@
 # coding=utf-8
-from __future__ import absolute_import, print_function
-
 import vfxnaming.rules as rules
 from vfxnaming import logger
 
@@ -45,3 +43,21 @@ class Test_Rule:
         rules.set_active_rule('test')
         result = rules.get_active_rule()
         assert result is not None
+
+    def test_active_replaced_and_removed(self):
+        rules.add_rule('test', '{category}_{function}')
+        replacement = rules.add_rule('test', '{category}_{function}_{digits}')
+        assert rules.get_active_rule() is replacement
+
+        rules.remove_rule('test')
+        assert rules.get_active_rule() is None
+
+    def test_fields_with_digits(self):
+        rule = rules.add_rule('test', '{side}-{region}_{side}-{region}_{digits}')
+        assert rule.fields == ('side', 'region', 'side', 'region', 'digits')
+        assert rule.fields_with_digits == ('side1', 'region1', 'side2', 'region2', 'digits')
+
+    def test_compose(self):
+        rule = rules.add_rule('test', 'hardcoded_{side}-{region}.{digits}')
+        assert rule.compose(['C', 'FRONT', '001']) == 'hardcoded_C-FRONT.001'
+        assert rule.compose(['C', 'FRONT', '001']) == rule.solve(side='C', region='FRONT', digits='001')
@@ -1,10 +1,9 @@
 # coding=utf-8
-from __future__ import absolute_import, print_function
-
 from vfxnaming import naming as n
 import vfxnaming.rules as rules
 import vfxnaming.tokens as tokens
 from vfxnaming import logger
+from vfxnaming.error import ParsingError, TokenError
 
 import pytest
 
@@ -83,6 +82,14 @@ class Test_Token_Options:
         result = self.light_category.has_option_fullname("default")
         assert result is False
 
+    def test_parse_after_options_change(self):
+        assert self.light_category.parse("dramatic") == "dramatic"
+        self.light_category.update_option("dramatic", "DRA")
+        assert self.light_category.parse("DRA") == "dramatic"
+        self.light_category.remove_option("dramatic")
+        with pytest.raises(TokenError):
+            self.light_category.parse("DRA")
+
     def test_has_option_abbreviation(self):
         result = self.light_category.has_option_abbreviation("volumetric")
         assert result is True
@@ -138,6 +145,13 @@ class Test_TokenNumber:
         solved = n.solve('chars', 32)
         assert solved == name
 
+    def test_negative_and_bool_solve(self):
+        token = tokens.get_token('number')
+        token.padding = 4
+        assert token.solve(-5) == '-005'
+        assert token.solve('7') == '0007'
+        assert token.solve(True) == 'True'
+
     def test_prefix_suffix_padding_parse(self):
         name = 'natural_custom_chars_v0032rt_LGT'
         tokens.remove_token('number')
@@ -176,3 +190,15 @@ class Test_TokenNumber:
         assert parsed['whatAffects'] == 'chars'
         assert parsed['number'] == 62
         assert parsed['type'] == 'lighting'
+
+    def test_parse_without_digits(self):
+        token = tokens.get_token('number')
+        assert token.parse('v0032rt') == 32
+        assert token.parse('vrt') is None
+        assert token.parse('v2x003') is None
+
+    def test_parse_name_without_number(self):
+        for name in ('natural_custom_chars_vrt_LGT', 'natural_custom_chars_v2x003_LGT'):
+            with pytest.raises(ParsingError) as exception:
+                n.parse(name)
+            assert "is not a valid number" in str(exception.value)